@@ -13,29 +13,51 @@ Usage:
     python scripts/update_ofac_list.py
     python scripts/update_ofac_list.py --output config/ofac_addresses.json
     python scripts/update_ofac_list.py --verify-only
+    python scripts/update_ofac_list.py --cache-dir .cache/ofac
 
 Author: Ultravioleta DAO
 License: MIT
 """
 
+# Only what --verify-only needs is imported here. The network, CSV and XML
+# modules (urllib.request alone pulls in ssl, http.client and email) are
+# imported inside the methods that use them.
 import argparse
-import csv
 import hashlib
+import io
 import json
 import re
 import sys
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from urllib.request import Request, urlopen
-from urllib.error import URLError
-import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from email.message import Message
 
 # OFAC Data Sources (Updated November 2025)
 OFAC_SDN_XML_URL = "https://sanctionslistservice.ofac.treas.gov/api/PublicationPreview/exports/SDN_ADVANCED.XML"
 OFAC_SDN_CSV_URL = "https://www.treasury.gov/ofac/downloads/sdn.csv"
 OFAC_ALTNAMES_CSV_URL = "https://www.treasury.gov/ofac/downloads/alt.csv"
 
+# SDN Advanced XML namespace, in ElementTree's "{uri}tag" (Clark) notation
+SDN_XML_NS = "{https://sanctionslistservice.ofac.treas.gov/api/PublicationPreview/exports/ADVANCED_XML}"
+FEATURE_TYPE_TAG = f"{SDN_XML_NS}FeatureType"
+DISTINCT_PARTY_TAG = f"{SDN_XML_NS}DistinctParty"
+FEATURE_TAG = f"{SDN_XML_NS}Feature"
+
+# Descendant lookups used while parsing, built once instead of per element
+VERSION_DETAIL_PATH = f".//{SDN_XML_NS}VersionDetail"
+IDENTITY_REFERENCE_PATH = f".//{SDN_XML_NS}IdentityReference"
+PROFILE_PATH = f".//{SDN_XML_NS}Profile"
+GIVEN_NAME_PATH = f".//{SDN_XML_NS}GivenName"
+SURNAME_PATH = f".//{SDN_XML_NS}Surname"
+ORGANISATION_NAME_PATH = f".//{SDN_XML_NS}OrganisationName"
+
 # Blockchain/currency mappings
 BLOCKCHAIN_ALIASES = {
     "XBT": "bitcoin",
@@ -52,46 +74,67 @@ BLOCKCHAIN_ALIASES = {
     "USDC": "usd-coin",
     "BSC": "binance-smart-chain",
     "BNB": "binance-coin",
-    "Digital Currency Address - XBT": "bitcoin",
-    "Digital Currency Address - ETH": "ethereum",
-    "Digital Currency Address - LTC": "litecoin",
-    "Digital Currency Address - XMR": "monero",
-    "Digital Currency Address - ZEC": "zcash",
-    "Digital Currency Address - DASH": "dash",
-    "Digital Currency Address - XRP": "ripple",
-    "Digital Currency Address - BCH": "bitcoin-cash",
-    "Digital Currency Address - BSV": "bitcoin-sv",
-    "Digital Currency Address - USDT": "tether",
-    "Digital Currency Address - USDC": "usd-coin",
 }
 
-# Address validation patterns
+# FeatureType label prefix in front of the currency code
+DCA_PREFIX = "Digital Currency Address - "
+
+# Address validation patterns (compiled once at import)
 ADDRESS_PATTERNS = {
-    "bitcoin": r"^[13][a-km-zA-HJ-NP-Z1-9]{25,34}$|^bc1[a-z0-9]{39,59}$",
-    "ethereum": r"^0x[a-fA-F0-9]{40}$",
-    "litecoin": r"^[LM3][a-km-zA-HJ-NP-Z1-9]{26,33}$|^ltc1[a-z0-9]{39,59}$",
-    "monero": r"^4[0-9AB][1-9A-HJ-NP-Za-km-z]{93}$",
-    "zcash": r"^t1[a-zA-Z0-9]{33}$|^zs1[a-z0-9]{75}$",
-    "ripple": r"^r[0-9a-zA-Z]{24,34}$",
+    "bitcoin": re.compile(r"^[13][a-km-zA-HJ-NP-Z1-9]{25,34}$|^bc1[a-z0-9]{39,59}$"),
+    "ethereum": re.compile(r"^0x[a-fA-F0-9]{40}$"),
+    "litecoin": re.compile(r"^[LM3][a-km-zA-HJ-NP-Z1-9]{26,33}$|^ltc1[a-z0-9]{39,59}$"),
+    "monero": re.compile(r"^4[0-9AB][1-9A-HJ-NP-Za-km-z]{93}$"),
+    "zcash": re.compile(r"^t1[a-zA-Z0-9]{33}$|^zs1[a-z0-9]{75}$"),
+    "ripple": re.compile(r"^r[0-9a-zA-Z]{24,34}$"),
 }
 
+# Deletes hex digits; a valid hex string translates to ""
+_HEX_STRIP_TABLE = str.maketrans("", "", "0123456789abcdefABCDEF")
+
+# Currency code in a FeatureType label (e.g. "Digital Currency Address - XBT")
+_DCA_RE = re.compile(r"Digital Currency Address\s*-\s*([A-Z]+)")
+
+
+def _is_valid_address(address: str, blockchain: str) -> bool:
+    """Validate a stripped address for a lowercase blockchain name"""
+    # Ethereum dominates the list; a length/prefix check plus a single
+    # C-level translate is much cheaper than regex dispatch
+    if blockchain == "ethereum":
+        return (
+            len(address) == 42
+            and address.startswith("0x")
+            and not address[2:].translate(_HEX_STRIP_TABLE)
+        )
+
+    # Check if blockchain has a known pattern
+    if blockchain in ADDRESS_PATTERNS:
+        return bool(ADDRESS_PATTERNS[blockchain].match(address))
 
+    # For unknown blockchains, do basic validation
+    # Must be alphanumeric, not empty, reasonable length
+    if not address or len(address) < 10:
+        return False
+
+    return True
+
+
+@dataclass(slots=True)
 class OfacAddress:
     """Represents a single OFAC-sanctioned cryptocurrency address"""
 
-    def __init__(
-        self,
-        address: str,
-        blockchain: str,
-        entity_name: str,
-        entity_id: str,
-        reason: str = "OFAC SDN List",
-    ):
-        self.address = address.strip()
-        self.blockchain = blockchain.lower()
-        self.entity_name = entity_name.strip()
-        self.entity_id = entity_id.strip()
-        self.reason = reason
+    # Slotted, so rows carry no per-instance __dict__
+    address: str
+    blockchain: str
+    entity_name: str
+    entity_id: str
+    reason: str = "OFAC SDN List"
+
+    def __post_init__(self):
+        self.address = self.address.strip()
+        self.blockchain = self.blockchain.lower()
+        self.entity_name = self.entity_name.strip()
+        self.entity_id = self.entity_id.strip()
 
     def to_dict(self) -> Dict:
         """Convert to JSON-serializable dict"""
@@ -105,24 +148,15 @@ class OfacAddress:
 
     def is_valid(self) -> bool:
         """Validate address format"""
-        # Check if blockchain has a known pattern
-        if self.blockchain in ADDRESS_PATTERNS:
-            pattern = ADDRESS_PATTERNS[self.blockchain]
-            return bool(re.match(pattern, self.address))
-
-        # For unknown blockchains, do basic validation
-        # Must be alphanumeric, not empty, reasonable length
-        if not self.address or len(self.address) < 10:
-            return False
-
-        return True
+        return _is_valid_address(self.address, self.blockchain)
 
 
 class OfacUpdater:
     """Downloads and processes OFAC sanctions lists"""
 
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, cache_dir: Optional[Path] = None):
         self.verbose = verbose
+        self.cache_dir = cache_dir  # raw downloads + HTTP validators, if set
         self.addresses: List[OfacAddress] = []
         self.currencies: Set[str] = set()
         self.entity_cache: Dict[str, str] = {}  # entity_id -> entity_name
@@ -132,51 +166,137 @@ class OfacUpdater:
         if self.verbose:
             print(f"[INFO] {message}")
 
-    def download_file(self, url: str) -> Optional[bytes]:
-        """Download file from URL with proper headers"""
+    def _cache_paths(self, url: str) -> Tuple[Path, Path]:
+        """Return (body, metadata) cache paths for a URL"""
+        name = Path(urlparse(url).path).name
+        return self.cache_dir / name, self.cache_dir / f"{name}.meta.json"
+
+    def _load_cached(self, url: str) -> Optional[Tuple[bytes, Dict]]:
+        """Load a cached download and its validators, if present and intact"""
+        body_path, meta_path = self._cache_paths(url)
+        if not body_path.exists() or not meta_path.exists():
+            return None
+
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError) as e:
+            self.log(f"Ignoring unreadable cache for {url}: {e}")
+            return None
+
+        if hashlib.sha256(body).hexdigest() != meta.get("sha256"):
+            self.log(f"Ignoring cache for {url}: checksum mismatch")
+            return None
+
+        return body, meta
+
+    def _store_cached(self, url: str, buf: io.BytesIO, headers: "Message") -> None:
+        """Persist a download with its ETag/Last-Modified for revalidation"""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        body_path, meta_path = self._cache_paths(url)
+        body = buf.getvalue()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(body)
+            meta = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": hashlib.sha256(body).hexdigest(),
+            }
+            meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        except OSError as e:
+            print(f"[WARN] Failed to cache {url}: {e}", file=sys.stderr)
+
+    def download_file(self, url: str) -> Optional[BinaryIO]:
+        """Download file from URL into an in-memory buffer, rewound for reading
+
+        With a cache directory configured, the previous download's ETag and
+        Last-Modified are sent as validators and a 304 reuses the cached body.
+        """
+        import gzip
+        import shutil
+        from urllib.error import HTTPError, URLError
+        from urllib.request import Request, urlopen
+
         self.log(f"Downloading {url}")
 
+        # Add user agent to avoid 403 errors; the SDN files compress ~10x
+        headers = {
+            "User-Agent": "x402-rs-compliance/1.0 (OFAC Compliance Tool)",
+            "Accept-Encoding": "gzip",
+        }
+
+        cached = self._load_cached(url) if self.cache_dir is not None else None
+        if cached is not None:
+            _, meta = cached
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
         try:
-            # Add user agent to avoid 403 errors
-            req = Request(
-                url,
-                headers={
-                    "User-Agent": "x402-rs-compliance/1.0 (OFAC Compliance Tool)"
-                },
-            )
+            req = Request(url, headers=headers)
 
+            # Stream the body in 64 KiB chunks instead of one large read()
+            buf = io.BytesIO()
             with urlopen(req, timeout=30) as response:
-                data = response.read()
-                self.log(f"Downloaded {len(data)} bytes")
-                return data
+                body = response
+                if response.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.GzipFile(fileobj=response)
+                shutil.copyfileobj(body, buf, 1 << 16)
+                response_headers = response.headers
+
+            self.log(f"Downloaded {buf.tell()} bytes")
+            if self.cache_dir is not None:
+                self._store_cached(url, buf, response_headers)
+
+            buf.seek(0)
+            return buf
+
+        except HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self.log(f"Not modified since last download, using cached copy of {url}")
+                return io.BytesIO(cached[0])
+            print(f"[ERROR] Failed to download {url}: {e}", file=sys.stderr)
+            return None
 
         except URLError as e:
             print(f"[ERROR] Failed to download {url}: {e}", file=sys.stderr)
             return None
 
-    def parse_sdn_csv(self) -> bool:
+    def download_sources(self) -> Tuple[Optional[BinaryIO], Optional[BinaryIO]]:
+        """Download the SDN CSV and XML concurrently, returning (csv, xml)"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            csv_future = executor.submit(self.download_file, OFAC_SDN_CSV_URL)
+            xml_future = executor.submit(self.download_file, OFAC_SDN_XML_URL)
+            return csv_future.result(), xml_future.result()
+
+    def parse_sdn_csv(self, csv_data: BinaryIO) -> bool:
         """Parse the SDN CSV file for entity information"""
-        self.log("Parsing SDN CSV for entity names")
+        import csv
 
-        csv_data = self.download_file(OFAC_SDN_CSV_URL)
-        if not csv_data:
-            return False
+        self.log("Parsing SDN CSV for entity names")
 
         try:
-            # Decode and parse CSV
-            csv_text = csv_data.decode("utf-8", errors="ignore")
-            reader = csv.reader(csv_text.splitlines())
+            # Decode and parse CSV straight from the buffer
+            csv_text = io.TextIOWrapper(csv_data, encoding="utf-8", errors="ignore", newline="")
+            reader = csv.reader(csv_text)
 
             # CSV format: ent_num, SDN_Name, SDN_Type, Program, Title, ...
-            for row in reader:
-                if len(row) < 2:
-                    continue
-
-                entity_id = row[0].strip()
-                entity_name = row[1].strip()
-
-                if entity_id and entity_name:
-                    self.entity_cache[entity_id] = entity_name
+            # Only the first two columns are needed; each is stripped once
+            self.entity_cache.update(
+                (entity_id, entity_name)
+                for row in reader
+                if len(row) >= 2
+                for entity_id, entity_name in ((row[0].strip(), row[1].strip()),)
+                if entity_id and entity_name
+            )
 
             self.log(f"Cached {len(self.entity_cache)} entity names")
             return True
@@ -185,75 +305,109 @@ class OfacUpdater:
             print(f"[ERROR] Failed to parse SDN CSV: {e}", file=sys.stderr)
             return False
 
-    def parse_sdn_xml(self) -> bool:
+    def parse_sdn_xml(self, xml_data: BinaryIO) -> bool:
         """Parse the SDN Advanced XML file for digital currency addresses"""
-        self.log("Parsing SDN Advanced XML for crypto addresses")
+        import xml.etree.ElementTree as ET
 
-        xml_data = self.download_file(OFAC_SDN_XML_URL)
-        if not xml_data:
-            return False
+        self.log("Parsing SDN Advanced XML for crypto addresses")
 
         try:
-            # Parse XML
-            xml_text = xml_data.decode("utf-8", errors="ignore")
-            root = ET.fromstring(xml_text)
-
-            # Define namespace
-            namespace = {"ns": "https://sanctionslistservice.ofac.treas.gov/api/PublicationPreview/exports/ADVANCED_XML"}
-
-            # Build FeatureType mapping (ID -> Currency)
-            feature_type_map = {}
-            for ft in root.findall(".//ns:FeatureType", namespace):
-                ft_id = ft.get("ID")
-                ft_text = ft.text
-                if ft_text and "Digital Currency Address" in ft_text:
-                    blockchain = self._extract_blockchain(ft_text)
-                    if blockchain:
-                        feature_type_map[ft_id] = blockchain
+            feature_type_map = {}  # FeatureTypeID -> blockchain
+            known_feature_types = set()  # every FeatureTypeID seen, crypto or not
+            identity_map = {}  # IdentityID -> entity name
+            pending_features = []  # (FeatureTypeID, address, IdentityID)
+
+            # Single streaming pass over the raw bytes. Features are buffered and
+            # resolved once the document ends, since the party they reference is
+            # not guaranteed to precede them. Features whose FeatureType was
+            # already seen and is not a crypto type (emails, websites, ...) are
+            # dropped on the spot; only crypto and still-unresolved ones are
+            # buffered. In the published file the FeatureTypes (under
+            # ReferenceValueSets) come first, so nearly all resolve. Every element is
+            # cleared as it ends, except descendants of a handled element that is
+            # still open (its handler reads them), so subtrees of the sections we
+            # skip (Locations, SanctionsEntries, ...) are released too.
+            handled_tags = (FEATURE_TAG, DISTINCT_PARTY_TAG, FEATURE_TYPE_TAG)
+            open_handled = 0  # handled elements currently being parsed
+            for event, elem in ET.iterparse(xml_data, events=("start", "end")):
+                tag = elem.tag
+
+                if event == "start":
+                    if tag in handled_tags:
+                        open_handled += 1
+                    continue
 
-            self.log(f"Found {len(feature_type_map)} crypto currency types")
+                if tag == FEATURE_TAG:
+                    feature_type_id = elem.get("FeatureTypeID")
+                    if (
+                        feature_type_id in feature_type_map
+                        or feature_type_id not in known_feature_types
+                    ):
+                        # Get the address from VersionDetail
+                        version_detail = elem.findtext(VERSION_DETAIL_PATH, "")
+                        if version_detail:
+                            # Get entity reference
+                            identity_ref = elem.find(IDENTITY_REFERENCE_PATH)
+                            identity_id = identity_ref.get("IdentityID") if identity_ref is not None else None
+                            pending_features.append(
+                                (feature_type_id, version_detail.strip(), identity_id)
+                            )
+
+                elif tag == DISTINCT_PARTY_TAG:
+                    identity_id = elem.get("FixedRef")
+
+                    # Try to get name from Profile
+                    profile = elem.find(PROFILE_PATH)
+                    if profile is not None:
+                        # Individual
+                        given_name = profile.findtext(GIVEN_NAME_PATH, "")
+                        surname = profile.findtext(SURNAME_PATH, "")
+                        if given_name or surname:
+                            identity_map[identity_id] = f"{given_name} {surname}".strip()
+                        else:
+                            # Organization
+                            org_name = profile.findtext(ORGANISATION_NAME_PATH, "")
+                            if org_name:
+                                identity_map[identity_id] = org_name
+
+                elif tag == FEATURE_TYPE_TAG:
+                    known_feature_types.add(elem.get("ID"))
+                    ft_text = elem.text
+                    if ft_text and "Digital Currency Address" in ft_text:
+                        blockchain = self._extract_blockchain(ft_text)
+                        if blockchain:
+                            feature_type_map[elem.get("ID")] = blockchain
+
+                elif open_handled:
+                    # Part of a handled element's subtree, read when it ends
+                    continue
 
-            # Build Identity mapping (IdentityID -> Name)
-            identity_map = {}
-            for identity in root.findall(".//ns:DistinctParty", namespace):
-                identity_id = identity.get("FixedRef")
-
-                # Try to get name from Profile
-                profile = identity.find(".//ns:Profile", namespace)
-                if profile is not None:
-                    # Individual
-                    given_name = profile.findtext(".//ns:GivenName", "", namespace)
-                    surname = profile.findtext(".//ns:Surname", "", namespace)
-                    if given_name or surname:
-                        identity_map[identity_id] = f"{given_name} {surname}".strip()
-                    else:
-                        # Organization
-                        org_name = profile.findtext(".//ns:OrganisationName", "", namespace)
-                        if org_name:
-                            identity_map[identity_id] = org_name
+                if tag in handled_tags:
+                    open_handled -= 1
+                elem.clear()
 
+            self.log(f"Found {len(feature_type_map)} crypto currency types")
             self.log(f"Built identity map for {len(identity_map)} entities")
 
-            # Extract crypto addresses from Features
-            for feature in root.findall(".//ns:Feature", namespace):
-                feature_type_id = feature.get("FeatureTypeID")
-
+            # Extract crypto addresses from the buffered Features. The same
+            # address can be listed under several Features; keep the first.
+            seen: Set[Tuple[str, str]] = set()
+            for feature_type_id, address, identity_id in pending_features:
                 # Check if this is a crypto address
                 if feature_type_id not in feature_type_map:
                     continue
 
                 blockchain = feature_type_map[feature_type_id]
 
-                # Get the address from VersionDetail
-                version_detail = feature.findtext(".//ns:VersionDetail", "", namespace)
-                if not version_detail:
+                # Output addresses are lowercased, so dedupe on that form
+                key = (blockchain, address.lower())
+                if key in seen:
                     continue
 
-                address = version_detail.strip()
-
-                # Get entity reference
-                identity_ref = feature.find(".//ns:IdentityReference", namespace)
-                identity_id = identity_ref.get("IdentityID") if identity_ref is not None else None
+                # Basic validation, before paying for an OfacAddress
+                if not _is_valid_address(address, blockchain):
+                    self.log(f"Skipping invalid address: {address} ({blockchain})")
+                    continue
 
                 # Get entity name
                 entity_name = "Unknown Entity"
@@ -271,12 +425,9 @@ class OfacUpdater:
                     reason="OFAC SDN List",
                 )
 
-                # Basic validation
-                if addr.is_valid():
-                    self.addresses.append(addr)
-                    self.currencies.add(blockchain)
-                else:
-                    self.log(f"Skipping invalid address: {address} ({blockchain})")
+                seen.add(key)
+                self.addresses.append(addr)
+                self.currencies.add(blockchain)
 
             self.log(f"Extracted {len(self.addresses)} valid crypto addresses")
             return True
@@ -290,46 +441,69 @@ class OfacUpdater:
             traceback.print_exc()
             return False
 
-    def _extract_blockchain(self, id_type: str) -> Optional[str]:
-        """Extract blockchain name from ID type string"""
-        # Direct mapping
-        if id_type in BLOCKCHAIN_ALIASES:
-            return BLOCKCHAIN_ALIASES[id_type]
-
-        # Extract currency code (e.g., "Digital Currency Address - XBT" -> "XBT")
-        match = re.search(r"Digital Currency Address\s*-\s*([A-Z]+)", id_type)
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _extract_blockchain(id_type: str) -> Optional[str]:
+        """Extract blockchain name from ID type string (memoized; labels repeat)"""
+        # Direct mapping on the bare currency code (the common, well-formed case)
+        code = id_type.removeprefix(DCA_PREFIX)
+        if code in BLOCKCHAIN_ALIASES:
+            return BLOCKCHAIN_ALIASES[code]
+
+        # Unknown code or irregular spacing: extract currency code (e.g., "Digital Currency Address - XBT" -> "XBT")
+        match = _DCA_RE.search(id_type)
         if match:
             currency_code = match.group(1)
             return BLOCKCHAIN_ALIASES.get(currency_code, currency_code.lower())
 
         return None
 
-    def generate_json(self) -> Dict:
-        """Generate final JSON structure"""
+    def generate_metadata(self) -> Dict:
+        """Generate the metadata block of the output JSON"""
         return {
-            "metadata": {
-                "source": "OFAC Specially Designated Nationals (SDN) List",
-                "source_url": OFAC_SDN_XML_URL,
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                "total_addresses": len(self.addresses),
-                "currencies": sorted(list(self.currencies)),
-            },
-            "addresses": [addr.to_dict() for addr in self.addresses],
+            "source": "OFAC Specially Designated Nationals (SDN) List",
+            "source_url": OFAC_SDN_XML_URL,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "total_addresses": len(self.addresses),
+            "currencies": sorted(list(self.currencies)),
         }
 
     def save_to_file(self, output_path: Path):
-        """Save addresses to JSON file"""
-        data = self.generate_json()
+        """Save addresses to JSON file
+
+        Writes {"metadata": ..., "addresses": [...]} one address at a time, so
+        no intermediate list of address dicts is built.
+        """
+        metadata = self.generate_metadata()
 
-        # Pretty print with indentation
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
+        # The checksum covers the bytes written to the file, the same value
+        # the facilitator computes when it loads the list
+        pretty = json.JSONEncoder(indent=2, ensure_ascii=False)
+        hasher = hashlib.sha256()
 
-        # Write to file
+        # Write to file, in the same layout json.dumps(indent=2) gives the
+        # whole document. Nested blocks are re-indented to their depth; JSON
+        # strings never contain raw newlines, so the replace is safe.
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(json_str, encoding="utf-8")
+        with output_path.open("wb") as f:
+            def emit(text: str):
+                encoded = text.encode("utf-8")
+                f.write(encoded)
+                hasher.update(encoded)
 
-        # Calculate checksum
-        checksum = hashlib.sha256(json_str.encode("utf-8")).hexdigest()
+            emit('{\n  "metadata": ')
+            emit(pretty.encode(metadata).replace("\n", "\n  "))
+            emit(',\n  "addresses": [')
+
+            separator = ""
+            for addr in self.addresses:
+                entry = addr.to_dict()
+                emit(separator + "\n    " + pretty.encode(entry).replace("\n", "\n    "))
+                separator = ","
+
+            emit("\n  ]\n}" if self.addresses else "]\n}")
+
+        checksum = hasher.hexdigest()
 
         self.log(f"Saved {len(self.addresses)} addresses to {output_path}")
         self.log(f"File checksum (SHA-256): {checksum}")
@@ -347,14 +521,10 @@ class OfacUpdater:
         print()
 
         # Top entities by address count
-        entity_counts: Dict[str, int] = {}
-        for addr in self.addresses:
-            entity_counts[addr.entity_name] = entity_counts.get(addr.entity_name, 0) + 1
+        entity_counts = Counter(addr.entity_name for addr in self.addresses)
 
         print("Top 10 entities by address count:")
-        for entity, count in sorted(
-            entity_counts.items(), key=lambda x: x[1], reverse=True
-        )[:10]:
+        for entity, count in entity_counts.most_common(10):
             print(f"  {count:3d}  {entity}")
 
         print("=" * 60)
@@ -376,6 +546,12 @@ def main():
         action="store_true",
         help="Verify existing file without downloading",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Cache raw downloads here and skip re-downloading unchanged sources "
+        "(ETag/Last-Modified revalidation)",
+    )
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose logging"
     )
@@ -399,16 +575,18 @@ def main():
     print("x402-rs OFAC Sanctions List Updater")
     print("=" * 60)
 
-    updater = OfacUpdater(verbose=args.verbose)
+    updater = OfacUpdater(verbose=args.verbose, cache_dir=args.cache_dir)
+
+    # Step 1: Download entity list (CSV) and digital currency addresses (XML)
+    print("\n[1/3] Downloading SDN entity list and digital currency addresses...")
+    csv_data, xml_data = updater.download_sources()
 
-    # Step 1: Download entity names from CSV
-    print("\n[1/3] Downloading SDN entity list...")
-    if not updater.parse_sdn_csv():
+    # Step 2: Parse entity names, then crypto addresses
+    print("\n[2/3] Parsing SDN data...")
+    if csv_data is None or not updater.parse_sdn_csv(csv_data):
         print("[WARN] Failed to download entity list, continuing anyway...")
 
-    # Step 2: Download and parse digital currency addresses from XML
-    print("\n[2/3] Downloading digital currency addresses...")
-    if not updater.parse_sdn_xml():
+    if xml_data is None or not updater.parse_sdn_xml(xml_data):
         print("[ERROR] Failed to download OFAC data", file=sys.stderr)
         return 1
 
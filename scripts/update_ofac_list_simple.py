@@ -9,9 +9,11 @@ Source: https://github.com/0xB10C/ofac-sanctioned-digital-currency-addresses
 (Mirror of official OFAC data)
 """
 
+import gzip
 import json
 import hashlib
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib.request import Request, urlopen
@@ -22,14 +24,42 @@ OFAC_BTC_URL = "https://raw.githubusercontent.com/0xB10C/ofac-sanctioned-digital
 OFAC_XMR_URL = "https://raw.githubusercontent.com/0xB10C/ofac-sanctioned-digital-currency-addresses/master/sanctioned_addresses_XMR.json"
 OFAC_LTC_URL = "https://raw.githubusercontent.com/0xB10C/ofac-sanctioned-digital-currency-addresses/master/sanctioned_addresses_LTC.json"
 
+# (url, blockchain, entity_id prefix), in output order
+SOURCES = [
+    (OFAC_JSON_URL, "ethereum", "ETH"),
+    (OFAC_BTC_URL, "bitcoin", "BTC"),
+    (OFAC_XMR_URL, "monero", "XMR"),
+    (OFAC_LTC_URL, "litecoin", "LTC"),
+]
+
 def download(url):
     """Download file from URL"""
-    print(f"Downloading {url}")
-    req = Request(url, headers={'User-Agent': 'x402-rs/1.0'})
+    req = Request(url, headers={'User-Agent': 'x402-rs/1.0', 'Accept-Encoding': 'gzip'})
     with urlopen(req, timeout=30) as response:
-        data = json.loads(response.read().decode('utf-8'))
-        print(f"  Found {len(data)} addresses")
-        return data
+        body = response
+        if response.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.GzipFile(fileobj=response)
+        # json.load accepts the raw UTF-8 bytes; no separate decode step
+        return json.load(body)
+
+def to_entries(data, blockchain, prefix):
+    """Convert a downloaded address list into output entries, dropping duplicates"""
+    entries = []
+    seen = set()
+    for addr in data:
+        # Ethereum addresses are case-insensitive; normalize to lowercase
+        address = addr.lower() if blockchain == "ethereum" else addr
+        if address in seen:
+            continue
+        seen.add(address)
+        entries.append({
+            "address": address,
+            "blockchain": blockchain,
+            "entity_name": "OFAC Sanctioned Entity",
+            "entity_id": prefix + "-" + addr[:8],
+            "reason": "OFAC SDN List"
+        })
+    return entries
 
 def main():
     output_path = Path("config/ofac_addresses.json")
@@ -40,69 +70,28 @@ def main():
     all_addresses = []
     currencies = set()
 
-    # Download Ethereum addresses
-    print("\n[1/4] Downloading Ethereum addresses...")
-    try:
-        eth_data = download(OFAC_JSON_URL)
-        for addr in eth_data:
-            all_addresses.append({
-                "address": addr.lower(),
-                "blockchain": "ethereum",
-                "entity_name": "OFAC Sanctioned Entity",
-                "entity_id": "ETH-" + addr[:8],
-                "reason": "OFAC SDN List"
-            })
-        currencies.add("ethereum")
-    except Exception as e:
-        print(f"  ERROR: {e}")
-
-    # Download Bitcoin addresses
-    print("\n[2/4] Downloading Bitcoin addresses...")
-    try:
-        btc_data = download(OFAC_BTC_URL)
-        for addr in btc_data:
-            all_addresses.append({
-                "address": addr,
-                "blockchain": "bitcoin",
-                "entity_name": "OFAC Sanctioned Entity",
-                "entity_id": "BTC-" + addr[:8],
-                "reason": "OFAC SDN List"
-            })
-        currencies.add("bitcoin")
-    except Exception as e:
-        print(f"  ERROR: {e}")
-
-    # Download Monero addresses
-    print("\n[3/4] Downloading Monero addresses...")
-    try:
-        xmr_data = download(OFAC_XMR_URL)
-        for addr in xmr_data:
-            all_addresses.append({
-                "address": addr,
-                "blockchain": "monero",
-                "entity_name": "OFAC Sanctioned Entity",
-                "entity_id": "XMR-" + addr[:8],
-                "reason": "OFAC SDN List"
-            })
-        currencies.add("monero")
-    except Exception as e:
-        print(f"  ERROR: {e}")
-
-    # Download Litecoin addresses
-    print("\n[4/4] Downloading Litecoin addresses...")
-    try:
-        ltc_data = download(OFAC_LTC_URL)
-        for addr in ltc_data:
-            all_addresses.append({
-                "address": addr,
-                "blockchain": "litecoin",
-                "entity_name": "OFAC Sanctioned Entity",
-                "entity_id": "LTC-" + addr[:8],
-                "reason": "OFAC SDN List"
-            })
-        currencies.add("litecoin")
-    except Exception as e:
-        print(f"  ERROR: {e}")
+    # The downloads are independent and network-bound, so fetch them concurrently
+    print(f"\nDownloading {len(SOURCES)} address lists...")
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+        futures = {
+            executor.submit(download, url): (blockchain, prefix)
+            for url, blockchain, prefix in SOURCES
+        }
+        for future in as_completed(futures):
+            blockchain, prefix = futures[future]
+            try:
+                data = future.result()
+                results[blockchain] = to_entries(data, blockchain, prefix)
+                print(f"  {blockchain}: found {len(data)} addresses")
+            except Exception as e:
+                print(f"  {blockchain}: ERROR: {e}")
+
+    # Assemble in SOURCES order, independent of completion order
+    for _, blockchain, _ in SOURCES:
+        if blockchain in results:
+            all_addresses.extend(results[blockchain])
+            currencies.add(blockchain)
 
     if not all_addresses:
         print("\n[ERROR] No addresses downloaded!")
@@ -122,10 +111,10 @@ def main():
 
     # Save
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    json_str = json.dumps(data, indent=2)
-    output_path.write_text(json_str, encoding='utf-8')
+    payload = json.dumps(data, indent=2).encode('utf-8')
+    output_path.write_bytes(payload)
 
-    checksum = hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+    checksum = hashlib.sha256(payload).hexdigest()
 
     print("\n" + "=" * 60)
     print("SUCCESS!")
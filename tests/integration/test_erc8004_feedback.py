@@ -69,100 +69,276 @@ feedback_request = {
 }
 """
 
-import requests
+# requests (urllib3, certifi, contexto SSL) se importa recien al primer uso de
+# la sesion, para que demo_real_flow() corra sin pagar ese costo de arranque.
+import argparse
+import io
 import json
+import os
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 # Configuracion
-FACILITATOR_URL = "https://facilitator.ultravioletadao.xyz"
+# X402_TEST_MODE=mock corre los tests contra un facilitador simulado en
+# proceso (sin red); "live" (por defecto) usa el facilitador real.
+MODE = os.getenv("X402_TEST_MODE", "live")
+LIVE_FACILITATOR_URL = "https://facilitator.ultravioletadao.xyz"
+
+# Respuestas fijas del facilitador simulado
+_MOCK_FEEDBACK_INFO = {
+    "endpoint": "/feedback",
+    "extension": "8004-reputation",
+    "contracts": {
+        "reputationRegistry": "0x0000000000000000000000000000000000008004",
+        "supportedNetworks": ["ethereum-mainnet"],
+    },
+}
+
+
+def _start_mock_facilitator():
+    """Levanta un facilitador simulado en localhost (hilo daemon) y retorna su URL.
+
+    GET /feedback responde la info del endpoint; POST /feedback rechaza con 400
+    igual que el facilitador real ante un body vacio o una red no soportada."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    info_body = json.dumps(_MOCK_FEEDBACK_INFO).encode("utf-8")
+
+    class MockFacilitatorHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, como el facilitador real
+
+        def _reply(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/feedback":
+                self._reply(200, info_body)
+            else:
+                self._reply(404, b'{"error":"Not found"}')
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                network = json.loads(raw or b"{}").get("network")
+            except ValueError:
+                network = None
+            if network is None:
+                error = "Invalid request: missing field `network`"
+            elif network != "ethereum-mainnet":
+                error = f"Network {network} not supported for ERC-8004 feedback"
+            else:
+                error = "Invalid proof of payment: transaction not found"
+            self._reply(400, json.dumps({"error": error}).encode("utf-8"))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockFacilitatorHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+FACILITATOR_URL = _start_mock_facilitator() if MODE == "mock" else LIVE_FACILITATOR_URL
+
+# X402_RUN_FAKE_PROOF=1 habilita el test 3, que envia una transaccion real (gasta gas)
+RUN_FAKE_PROOF = os.getenv("X402_RUN_FAKE_PROOF") == "1"
+
+_FEEDBACK_URL = f"{FACILITATOR_URL}/feedback"
+
+
+def setup_session():
+    """Sesion HTTP compartida: todos los tests reutilizan la misma conexion TCP/TLS"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    # Reintentos con backoff ante cortes y 502/503/504 transitorios del
+    # facilitador (respetando Retry-After). POST incluido solo porque por esta
+    # sesion van los POST de validacion, que son rechazados sin cambiar estado;
+    # un POST que dispara una transaccion on-chain va por post_without_retries().
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
+    return session
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    """Sesion compartida, creada en el primer uso (main() la crea antes de lanzar hilos)"""
+    return setup_session()
+
+
+def post_without_retries(url, **kwargs):
+    """POST en una sesion aparte que nunca reintenta: un 504 del gateway mientras
+    la transaccion se envia no debe volver a enviarla (y pagar gas dos veces)"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    with requests.Session() as session:
+        adapter = HTTPAdapter(max_retries=Retry(total=0, read=False))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session.post(url, **kwargs)
+
+
+# Hashes y direcciones de relleno para los proofs falsos
+_HEX_A64 = "0x" + "a"*64
+_HEX_B64 = "0x" + "b"*64
+_HEX_1_40 = "0x" + "1"*40
+_HEX_2_40 = "0x" + "2"*40
+_HEX_3_40 = "0x" + "3"*40
+
+# Bodies de los POST de validacion, serializados una sola vez al importar
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_EMPTY_BODY = b"{}"
+_UNSUPPORTED_NETWORK_FEEDBACK = {
+    "x402_version": 1,
+    "network": "base-mainnet",  # No soportada para ERC-8004
+    "feedback": {
+        "agent": "0x1234567890123456789012345678901234567890",
+        "score": 5,
+        "proof": {
+            "transaction_hash": _HEX_A64,
+            "block_number": 12345678,
+            "network": "base-mainnet",
+            "payer": _HEX_1_40,
+            "payee": _HEX_2_40,
+            "amount": "1000000",
+            "token": _HEX_3_40,
+            "timestamp": 1706500000,
+            "payment_hash": _HEX_B64
+        }
+    }
+}
+_UNSUPPORTED_NETWORK_BODY = json.dumps(_UNSUPPORTED_NETWORK_FEEDBACK).encode("utf-8")
 
-def test_feedback_endpoint_info():
+
+def print_banner(title, out, quiet=False):
+    """Banner de seccion de un test, salvo en modo --quiet"""
+    if not quiet:
+        print(f"\n{'='*60}\n{title}\n{'='*60}", file=out)
+
+
+def buffered_output(test):
+    """Acumula la salida de un test en memoria y la escribe de una sola vez en
+    `out` (stdout por defecto), para que tests en paralelo no se intercalen.
+
+    Con `out` (desde main) retorna (nombre, ok): un error de red o una respuesta
+    que no es JSON se reporta como fallo del test en vez de propagarse y tumbar
+    a los demas tests en curso. Sin `out` (bajo pytest) el fallo se afirma con
+    assert para que el test falle."""
+    def wrapper(out=None, quiet=False):
+        import requests
+
+        buf = io.StringIO()
+        try:
+            ok = bool(test(buf, quiet))
+        except (requests.RequestException, ValueError) as e:
+            print(f"\n[ERROR] {test.__name__}: {e}", file=buf)
+            ok = False
+        finally:
+            (out or sys.stdout).write(buf.getvalue())
+
+        if out is None:
+            assert ok, f"{test.__name__} fallo"
+            return None
+        return test.__name__, ok
+
+    # Sin functools.wraps: pytest seguiria __wrapped__ y tomaria `out` como fixture
+    wrapper.__name__ = test.__name__
+    wrapper.__doc__ = test.__doc__
+    return wrapper
+
+
+@buffered_output
+def test_feedback_endpoint_info(out, quiet=False):
     """Test 1: Verificar que el endpoint /feedback existe y retorna la info correcta"""
-    print("\n" + "="*60)
-    print("TEST 1: GET /feedback - Informacion del endpoint")
-    print("="*60)
+    print_banner("TEST 1: GET /feedback - Informacion del endpoint", out, quiet)
 
-    response = requests.get(f"{FACILITATOR_URL}/feedback")
-    print(f"Status: {response.status_code}")
+    response = get_session().get(_FEEDBACK_URL)
+    print(f"Status: {response.status_code}", file=out)
 
     if response.status_code == 200:
-        data = response.json()
-        print(f"\nEndpoint: {data.get('endpoint')}")
-        print(f"Extension: {data.get('extension')}")
-        print(f"\nContratos:")
+        data = json.loads(response.content)
+        print(f"\nEndpoint: {data.get('endpoint')}", file=out)
+        print(f"Extension: {data.get('extension')}", file=out)
+        print(f"\nContratos:", file=out)
         contracts = data.get('contracts', {})
-        print(f"  ReputationRegistry: {contracts.get('reputationRegistry')}")
-        print(f"  Redes soportadas: {contracts.get('supportedNetworks')}")
+        print(f"  ReputationRegistry: {contracts.get('reputationRegistry')}", file=out)
+        print(f"  Redes soportadas: {contracts.get('supportedNetworks')}", file=out)
 
         # Verificar que solo Ethereum mainnet esta soportado
         supported = contracts.get('supportedNetworks', [])
         if supported == ["ethereum-mainnet"]:
-            print("\n[OK] Solo Ethereum Mainnet esta soportado (correcto)")
+            print("\n[OK] Solo Ethereum Mainnet esta soportado (correcto)", file=out)
         else:
-            print(f"\n[WARN] Redes soportadas inesperadas: {supported}")
+            print(f"\n[WARN] Redes soportadas inesperadas: {supported}", file=out)
 
         return True
     else:
-        print(f"[ERROR] Response: {response.text}")
+        print(f"[ERROR] Response: {response.text}", file=out)
         return False
 
 
-def test_feedback_validation():
+@buffered_output
+def test_feedback_validation(out, quiet=False):
     """Test 2: Verificar validacion del endpoint /feedback"""
-    print("\n" + "="*60)
-    print("TEST 2: POST /feedback - Validacion de errores")
-    print("="*60)
+    print_banner("TEST 2: POST /feedback - Validacion de errores", out, quiet)
 
     # Test 2a: Request sin body
-    print("\n2a. Request vacio:")
-    response = requests.post(f"{FACILITATOR_URL}/feedback", json={})
-    print(f"  Status: {response.status_code}")
+    print("\n2a. Request vacio:", file=out)
+    response = get_session().post(_FEEDBACK_URL, data=_EMPTY_BODY, headers=_JSON_HEADERS)
+    print(f"  Status: {response.status_code}", file=out)
     if response.status_code == 400:
-        print("  [OK] Rechazado correctamente (400 Bad Request)")
+        print("  [OK] Rechazado correctamente (400 Bad Request)", file=out)
 
     # Test 2b: Network no soportada
-    print("\n2b. Network no soportada (base-mainnet):")
-    response = requests.post(f"{FACILITATOR_URL}/feedback", json={
-        "x402_version": 1,
-        "network": "base-mainnet",  # No soportada para ERC-8004
-        "feedback": {
-            "agent": "0x1234567890123456789012345678901234567890",
-            "score": 5,
-            "proof": {
-                "transaction_hash": "0x" + "a"*64,
-                "block_number": 12345678,
-                "network": "base-mainnet",
-                "payer": "0x" + "1"*40,
-                "payee": "0x" + "2"*40,
-                "amount": "1000000",
-                "token": "0x" + "3"*40,
-                "timestamp": 1706500000,
-                "payment_hash": "0x" + "b"*64
-            }
-        }
-    })
-    print(f"  Status: {response.status_code}")
-    data = response.json()
+    print("\n2b. Network no soportada (base-mainnet):", file=out)
+    response = get_session().post(
+        _FEEDBACK_URL, data=_UNSUPPORTED_NETWORK_BODY, headers=_JSON_HEADERS
+    )
+    print(f"  Status: {response.status_code}", file=out)
+    data = json.loads(response.content)
     if "not supported" in data.get("error", "").lower() or response.status_code == 400:
-        print("  [OK] Rechazado correctamente - red no soportada")
-    print(f"  Response: {json.dumps(data, indent=2)}")
+        print("  [OK] Rechazado correctamente - red no soportada", file=out)
+    print(f"  Response: {json.dumps(data, indent=2)}", file=out)
 
     return True
 
 
-def test_feedback_with_fake_proof():
+@buffered_output
+def test_feedback_with_fake_proof(out, quiet=False):
     """Test 3: Intentar enviar feedback con proof falso (debe fallar en on-chain)"""
-    print("\n" + "="*60)
-    print("TEST 3: POST /feedback - Proof falso en Ethereum Mainnet")
-    print("="*60)
-    print("\nNOTA: Este test enviara una transaccion real a Ethereum.")
-    print("El proof es falso, asi que el contrato deberia rechazarlo.")
-    print("Esto costara gas al facilitador.\n")
+    print_banner("TEST 3: POST /feedback - Proof falso en Ethereum Mainnet", out, quiet)
+    if not RUN_FAKE_PROOF:
+        print("\n[SKIP] Test deshabilitado para evitar gastar gas con proof falso", file=out)
+        print("Exporta X402_RUN_FAKE_PROOF=1 para ejecutar el test real", file=out)
+        return True
+
+    print("\nNOTA: Este test enviara una transaccion real a Ethereum.", file=out)
+    print("El proof es falso, asi que el contrato deberia rechazarlo.", file=out)
+    print("Esto costara gas al facilitador.\n", file=out)
 
     # Proof falso pero con formato correcto
     fake_proof = {
-        "transaction_hash": "0x" + "a"*64,
+        "transaction_hash": _HEX_A64,
         "block_number": 12345678,
         "network": "ethereum-mainnet",
         "payer": "0x1234567890123456789012345678901234567890",
@@ -170,7 +346,7 @@ def test_feedback_with_fake_proof():
         "amount": "1000000",
         "token": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",  # USDC real
         "timestamp": 1706500000,
-        "payment_hash": "0x" + "b"*64
+        "payment_hash": _HEX_B64
     }
 
     feedback_request = {
@@ -184,27 +360,18 @@ def test_feedback_with_fake_proof():
         }
     }
 
-    print("Request:")
-    print(json.dumps(feedback_request, indent=2))
-
-    # DESCOMENTAR para ejecutar (costara gas!)
-    # response = requests.post(f"{FACILITATOR_URL}/feedback", json=feedback_request)
-    # print(f"\nStatus: {response.status_code}")
-    # print(f"Response: {json.dumps(response.json(), indent=2)}")
+    print("Request:", file=out)
+    print(json.dumps(feedback_request, indent=2), file=out)
 
-    print("\n[SKIP] Test comentado para evitar gastar gas con proof falso")
-    print("Descomenta las lineas para ejecutar el test real")
+    response = post_without_retries(_FEEDBACK_URL, json=feedback_request)
+    print(f"\nStatus: {response.status_code}", file=out)
+    print(f"Response: {json.dumps(json.loads(response.content), indent=2)}", file=out)
 
     return True
 
 
-def demo_real_flow():
-    """Demostrar el flujo real completo (sin ejecutar)"""
-    print("\n" + "="*60)
-    print("DEMO: Flujo completo ERC-8004")
-    print("="*60)
-
-    print("""
+# Bloques de texto fijos: se arman una sola vez y se escriben de un golpe
+_DEMO_TEXT = "\n" + "="*60 + "\nDEMO: Flujo completo ERC-8004\n" + "="*60 + "\n" + """
 PASO 1: HACER UN PAGO x402 CON EXTENSION 8004-reputation
 =========================================================
 
@@ -275,26 +442,16 @@ ReputationRegistry: 0x8004BAa17C55a88189AE136b182e5fdA19dE9b63
 
 Cualquiera puede leer la reputacion del agente llamando:
     registry.getReputation(agentAddress) -> (score, feedbackCount)
-""")
 
+"""
 
-def main():
-    print("\n" + "#"*60)
-    print("# ERC-8004 FEEDBACK INTEGRATION TEST")
-    print("# Facilitator:", FACILITATOR_URL)
-    print("# Fecha:", datetime.now().isoformat())
-    print("#"*60)
-
-    # Ejecutar tests
-    test_feedback_endpoint_info()
-    test_feedback_validation()
-    test_feedback_with_fake_proof()
-    demo_real_flow()
-
-    print("\n" + "="*60)
-    print("RESUMEN")
-    print("="*60)
-    print("""
+
+def demo_real_flow():
+    """Demostrar el flujo real completo (sin ejecutar)"""
+    sys.stdout.write(_DEMO_TEXT)
+
+
+_SUMMARY_TEXT = "\n" + "="*60 + "\nRESUMEN\n" + "="*60 + "\n" + """
 Para usar ERC-8004 feedback en produccion:
 
 1. El CLIENTE debe incluir en su PaymentRequirements:
@@ -307,8 +464,73 @@ Para usar ERC-8004 feedback en produccion:
 Contratos en Ethereum Mainnet:
 - IdentityRegistry:   0x8004A169FB4a3325136EB29fA0ceB6D2e539a432
 - ReputationRegistry: 0x8004BAa17C55a88189AE136b182e5fdA19dE9b63
-""")
+
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="ERC-8004 feedback integration test against the x402 facilitator"
+    )
+    parser.add_argument(
+        "--demo-only",
+        "--skip-network",
+        action="store_true",
+        help="Only print the ERC-8004 flow demo; do not contact the facilitator",
+    )
+    parser.add_argument(
+        "--no-demo", action="store_true", help="Skip the ERC-8004 flow demo text"
+    )
+    parser.add_argument(
+        "--quiet", "-q", action="store_true", help="Suppress the run and test banners"
+    )
+    args = parser.parse_args()
+
+    if args.demo_only:
+        demo_real_flow()
+        sys.stdout.flush()
+        return 0
+
+    if not args.quiet:
+        sys.stdout.write("\n".join((
+            "",
+            "#"*60,
+            "# ERC-8004 FEEDBACK INTEGRATION TEST",
+            f"# Facilitator: {FACILITATOR_URL}",
+            f"# Fecha: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}",
+            "#"*60,
+            "",
+        )))
+
+    # Ejecutar tests: son independientes y esperan por red, asi que corren en
+    # paralelo. Cada uno escribe en su propio buffer, que se imprime en orden.
+    tests = (test_feedback_endpoint_info, test_feedback_validation, test_feedback_with_fake_proof)
+    buffers = [io.StringIO() for _ in tests]
+    get_session()  # crea la sesion una sola vez, antes de los hilos
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(test, buf, args.quiet) for test, buf in zip(tests, buffers)]
+            for future, buf in zip(futures, buffers):
+                try:
+                    results.append(future.result())
+                finally:
+                    sys.stdout.write(buf.getvalue())
+    finally:
+        get_session().close()
+
+    failed = [name for name, ok in results if not ok]
+    if failed:
+        print(f"\n[WARN] Tests con fallos: {', '.join(failed)}")
+
+    if not args.no_demo:
+        demo_real_flow()
+
+    sys.stdout.write(_SUMMARY_TEXT)
+    sys.stdout.flush()
+
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())